@@ -14,8 +14,9 @@ from rich.prompt import Prompt
 from .browser import LumoBrowser
 from .config import load_config
 from .extract import (
+    CodeBlock,
     extract_code_blocks,
-    extract_code_for_file,
+    extract_code_for_file_fast,
     extract_code_section,
     strip_conversational_text,
 )
@@ -27,6 +28,11 @@ console = Console()
 _last_message: str | None = None
 _last_response: str | None = None
 
+# Streamed tokens are batched up to this many characters (or until a
+# newline) before printing, so each token doesn't pay a full Rich
+# render pass
+STREAM_FLUSH_CHARS = 256
+
 
 def parse_args() -> argparse.Namespace:
     """Parse command-line arguments."""
@@ -313,7 +319,7 @@ async def run_repl(client: LumoBrowser, args: argparse.Namespace) -> None:
                 if not blocks:
                     inline_code = extract_code_section(_last_response)
                     if inline_code:
-                        blocks = [{"language": "", "code": inline_code}]
+                        blocks = [CodeBlock(language="", code=inline_code)]
 
                 if not blocks:
                     console.print("[yellow]No code blocks found in last response[/yellow]")
@@ -329,13 +335,13 @@ async def run_repl(client: LumoBrowser, args: argparse.Namespace) -> None:
                     console.print(f"[yellow]Invalid block number. Found {len(blocks)} code block(s).[/yellow]")
                     if len(blocks) > 1:
                         for i, b in enumerate(blocks, 1):
-                            lang = f" ({b['language']})" if b['language'] else ""
-                            preview = b['code'][:50].replace('\n', ' ')
+                            lang = f" ({b.language})" if b.language else ""
+                            preview = b.code[:50].replace('\n', ' ')
                             console.print(f"  [dim]{i}. {preview}...{lang}[/dim]")
                     continue
 
-                code = blocks[block_num]["code"]
-                lang = blocks[block_num]["language"]
+                code = blocks[block_num].code
+                lang = blocks[block_num].language
 
                 if copy_to_clipboard(code):
                     lang_info = f" ({lang})" if lang else ""
@@ -372,13 +378,28 @@ async def run_repl(client: LumoBrowser, args: argparse.Namespace) -> None:
             console.print("\n[bold magenta]LUMO[/bold magenta]")
 
             response_parts = []
+            stream_buffer: list[str] = []
+            buffered_chars = 0
+
+            def flush_stream() -> None:
+                nonlocal buffered_chars
+                if stream_buffer:
+                    console.print("".join(stream_buffer), end="", markup=False)
+                    stream_buffer.clear()
+                    buffered_chars = 0
 
             def on_token(token: str) -> None:
+                nonlocal buffered_chars
                 response_parts.append(token)
-                # Print token immediately for streaming effect
-                console.print(token, end="", markup=False)
+                stream_buffer.append(token)
+                buffered_chars += len(token)
+                # Flush on line breaks or once enough accumulates, so the
+                # stream stays live without a render pass per token
+                if "\n" in token or buffered_chars >= STREAM_FLUSH_CHARS:
+                    flush_stream()
 
             response = await client.send_message(user_input, on_token=on_token)
+            flush_stream()
             console.print()  # Newline after streaming
 
             # Store response for copy/save
@@ -407,7 +428,7 @@ async def run_single_message(client: LumoBrowser, message: str, args: argparse.N
     output_text = response
     if getattr(args, "code_only", False):
         language = getattr(args, "language", None)
-        extracted = extract_code_for_file(response, language=language)
+        extracted = extract_code_for_file_fast(response, language=language)
         if extracted:
             output_text = extracted
         else:
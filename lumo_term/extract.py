@@ -10,23 +10,32 @@ Supported languages for inline code detection:
 - C, C++, Java, SQL, YAML, Dockerfile
 """
 
-import ast
 import json
 import re
-from typing import TypedDict
+import sys
+from functools import lru_cache
+from typing import NamedTuple
 
 
-class CodeBlock(TypedDict):
-    """A code block extracted from a response."""
+class CodeBlock(NamedTuple):
+    """A code block extracted from a response.
+
+    A NamedTuple rather than a dict: two-field blocks are allocated in
+    bulk on long responses, and the tuple layout is a fraction of the
+    size of a dict per block. String keys are still accepted for
+    compatibility with the original dict-based records.
+    """
     language: str
     code: str
 
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            return getattr(self, key)
+        return tuple.__getitem__(self, key)
 
-# Regex pattern for markdown code fences
-CODE_FENCE_PATTERN = re.compile(
-    r"```(\w*)\n(.*?)```",
-    re.DOTALL
-)
+
+# Characters that can open a markdown code fence (``` or ~~~)
+_FENCE_CHARS = ("`", "~")
 
 # Language detection patterns - maps language to (start_patterns, continuation_patterns)
 # Start patterns detect the beginning of code blocks
@@ -250,20 +259,28 @@ LANGUAGE_PATTERNS: dict[str, tuple[list[str], list[str]]] = {
     ),
 }
 
-# Patterns that indicate conversational intro text
-INTRO_PATTERNS = [
-    r"^(?:here(?:'s| is)|sure[,!]|okay[,!]|certainly[,!]|of course[,!]).*?[:]\s*\n",
-    r"^(?:i(?:'ll| will)|let me).*?[:]\s*\n",
-    r"^.*?(?:you (?:asked|requested|wanted)).*?[:]\s*\n",
-    r"^.*?(?:the (?:code|script|function|solution)).*?[:]\s*\n",
+# Patterns that indicate conversational intro text, compiled once at
+# module load rather than per strip_conversational_text call. Applied
+# sequentially because removing one intro can expose the next at ^.
+_INTRO_RES = [
+    re.compile(p, re.IGNORECASE | re.MULTILINE)
+    for p in (
+        r"^(?:here(?:'s| is)|sure[,!]|okay[,!]|certainly[,!]|of course[,!]).*?[:]\s*\n",
+        r"^(?:i(?:'ll| will)|let me).*?[:]\s*\n",
+        r"^.*?(?:you (?:asked|requested|wanted)).*?[:]\s*\n",
+        r"^.*?(?:the (?:code|script|function|solution)).*?[:]\s*\n",
+    )
 ]
 
 # Patterns that indicate conversational outro text
-OUTRO_PATTERNS = [
-    r"\n\s*(?:i hope|let me know|feel free|if you (?:have|need)).*$",
-    r"\n\s*(?:this (?:will|should|code)).*?[.!]\s*$",
-    r"\n\s*(?:you can (?:run|execute|use|modify)).*$",
-    r"\n\s*(?:note:|note that|remember).*$",
+_OUTRO_RES = [
+    re.compile(p, re.IGNORECASE | re.MULTILINE)
+    for p in (
+        r"\n\s*(?:i hope|let me know|feel free|if you (?:have|need)).*$",
+        r"\n\s*(?:this (?:will|should|code)).*?[.!]\s*$",
+        r"\n\s*(?:you can (?:run|execute|use|modify)).*$",
+        r"\n\s*(?:note:|note that|remember).*$",
+    )
 ]
 
 
@@ -274,20 +291,68 @@ def extract_code_blocks(text: str) -> list[CodeBlock]:
         text: The response text containing markdown code fences.
 
     Returns:
-        List of CodeBlock dicts with 'language' and 'code' keys.
+        List of CodeBlock records with 'language' and 'code' fields.
 
     Example:
         >>> text = '```python\\nprint("hi")\\n```'
         >>> blocks = extract_code_blocks(text)
-        >>> blocks[0]["code"]
+        >>> blocks[0].code
         'print("hi")'
     """
+    return list(_scan_code_blocks(text))
+
+
+@lru_cache(maxsize=256)
+def _scan_code_blocks(text: str) -> tuple[CodeBlock, ...]:
+    """Scan text for fenced code blocks, memoized per input string.
+
+    A single line-by-line state machine rather than a regex: one pass,
+    no per-match allocations, and no backtracking on malformed fences.
+    Handles ``` and ~~~ fences of any length >= 3; a fence closes on a
+    line of at least as many of the same character and nothing else.
+
+    The same response is typically passed through several extractors
+    (extract_first_code_block, strip_conversational_text,
+    extract_code_for_file), so caching avoids repeating the scan.
+    """
     blocks = []
-    for match in CODE_FENCE_PATTERN.finditer(text):
-        language = match.group(1).lower()
-        code = match.group(2).strip()
-        blocks.append(CodeBlock(language=language, code=code))
-    return blocks
+    in_fence = False
+    fence_char = "`"
+    fence_len = 3
+    language = ""
+    code_buf: list[str] = []
+
+    for line in text.split("\n"):
+        stripped = line.lstrip(" ")
+
+        if in_fence:
+            closing = stripped.rstrip()
+            if (
+                closing.startswith(fence_char * fence_len)
+                and not closing.strip(fence_char)
+            ):
+                blocks.append(
+                    CodeBlock(language=language, code="\n".join(code_buf).strip())
+                )
+                in_fence = False
+            else:
+                code_buf.append(line)
+            continue
+
+        if stripped[:1] in _FENCE_CHARS:
+            fence_char = stripped[0]
+            run = len(stripped) - len(stripped.lstrip(fence_char))
+            if run >= 3:
+                in_fence = True
+                fence_len = run
+                # Labels come from a small fixed vocabulary ("python",
+                # "bash", ...), so interning shares one canonical object
+                # per label and lets the frequent language == "python"
+                # comparisons short-circuit on identity.
+                language = sys.intern(stripped[run:].strip().lower())
+                code_buf = []
+
+    return tuple(blocks)
 
 
 def extract_first_code_block(text: str) -> CodeBlock | None:
@@ -328,25 +393,41 @@ def strip_conversational_text(
     if blocks:
         if extract_all:
             # Concatenate all code blocks with newlines
-            return "\n\n".join(block["code"] for block in blocks)
+            return "\n\n".join(block.code for block in blocks)
         else:
             # Return just the first code block
-            return blocks[0]["code"]
+            return blocks[0].code
 
     # No code blocks - try to strip intro/outro patterns from plain text
     result = text
 
     # Remove intro patterns
-    for pattern in INTRO_PATTERNS:
-        result = re.sub(pattern, "", result, flags=re.IGNORECASE | re.MULTILINE)
+    for regex in _INTRO_RES:
+        result = regex.sub("", result)
 
     # Remove outro patterns
-    for pattern in OUTRO_PATTERNS:
-        result = re.sub(pattern, "", result, flags=re.IGNORECASE | re.MULTILINE)
+    for regex in _OUTRO_RES:
+        result = regex.sub("", result)
 
     return result.strip()
 
 
+@lru_cache(maxsize=32)
+def _fence_re_for(language: str) -> re.Pattern[str]:
+    """Compile a fence pattern specialized to one language label.
+
+    Used by extract_code_for_file so the common --language CLI flow can
+    grab the first matching block directly instead of materializing
+    every block and filtering.
+    """
+    return re.compile(
+        # The lookbehind keeps this from matching three backticks inside a
+        # longer fence (````python); those fall through to the block scan
+        rf"(?<!`)```{re.escape(language)}\n((?:[^`]|`(?!``))*)```",
+        re.IGNORECASE,
+    )
+
+
 def extract_code_for_file(
     text: str,
     language: str | None = None
@@ -363,16 +444,26 @@ def extract_code_for_file(
     Returns:
         Clean code string, or None if no code found.
     """
+    # If language specified, try the specialized single-language pattern
+    # first - it stops at the first matching block
+    if language:
+        match = _fence_re_for(language.lower()).search(text)
+        if match:
+            return match.group(1).strip()
+
     blocks = extract_code_blocks(text)
 
     if blocks:
-        # If language specified, prefer matching blocks
+        # The specialized pattern only handles plain backtick fences, so a
+        # matching block may still exist (tilde fences, padded labels);
+        # prefer it before defaulting to the first block
         if language:
+            target = language.lower()
             for block in blocks:
-                if block["language"] == language.lower():
-                    return block["code"]
+                if block.language == target:
+                    return block.code
         # Return first block
-        return blocks[0]["code"]
+        return blocks[0].code
 
     # No code fences - try to extract inline code section
     code_section = extract_code_section(text)
@@ -387,22 +478,59 @@ def extract_code_for_file(
     return None
 
 
-def _looks_like_code(text: str) -> bool:
-    """Heuristic check if text looks like code."""
-    # Collect all start patterns from all languages
-    for lang, (start_patterns, _) in LANGUAGE_PATTERNS.items():
-        for pattern in start_patterns:
-            if re.search(pattern, text, re.MULTILINE | re.IGNORECASE):
-                return True
+# Single alternation of every language's start patterns, compiled once so
+# _looks_like_code does one scan instead of one re.search per pattern.
+_CODE_SIGNAL_RE = re.compile(
+    "|".join(
+        f"(?:{pattern})"
+        for start_patterns, _ in LANGUAGE_PATTERNS.values()
+        for pattern in start_patterns
+    ),
+    re.MULTILINE | re.IGNORECASE,
+)
 
-    # Additional generic code indicators
-    generic_indicators = [
+# Generic code indicators not tied to any one language (case-sensitive).
+_GENERIC_SIGNAL_RE = re.compile(
+    "|".join([
         r"^#!",                    # Shebang
         r"[{};]\s*$",              # Braces/semicolons at end of lines
         r"^\s*\w+\s*\([^)]*\)\s*[{:]",  # Function definitions
         r"=\s*(?:function|\(.*?\)\s*=>)",  # JS functions
-    ]
-    return any(re.search(p, text, re.MULTILINE) for p in generic_indicators)
+    ]),
+    re.MULTILINE,
+)
+
+
+def _looks_like_code(text: str) -> bool:
+    """Heuristic check if text looks like code."""
+    return (
+        _CODE_SIGNAL_RE.search(text) is not None
+        or _GENERIC_SIGNAL_RE.search(text) is not None
+    )
+
+
+# Languages where keywords are case-insensitive
+_CASE_INSENSITIVE_LANGS = {"sql", "batch", "powershell"}
+
+
+def _build_language_detect_re() -> re.Pattern[str]:
+    """Combine every language's start patterns into one alternation.
+
+    Each language gets a named group so a single match call classifies a
+    line instead of trying dozens of patterns one by one. Alternation
+    order preserves LANGUAGE_PATTERNS order, so the first matching
+    language wins exactly as the old per-language loop did.
+    """
+    branches = []
+    for lang, (start_patterns, _) in LANGUAGE_PATTERNS.items():
+        body = "|".join(f"(?:{p})" for p in start_patterns)
+        if lang in _CASE_INSENSITIVE_LANGS:
+            body = f"(?i:{body})"
+        branches.append(f"(?P<{lang}>{body})")
+    return re.compile("|".join(branches))
+
+
+_LANGUAGE_DETECT_RE = _build_language_detect_re()
 
 
 def _detect_language(line: str) -> str | None:
@@ -414,17 +542,37 @@ def _detect_language(line: str) -> str | None:
     Returns:
         Language name if detected, None otherwise.
     """
-    stripped = line.strip()
+    match = _LANGUAGE_DETECT_RE.match(line.strip())
+    if not match:
+        return None
+    # Exactly one language branch matched; some start patterns contain
+    # their own capturing groups, so lastgroup is not reliable here.
+    for lang, value in match.groupdict().items():
+        if value is not None:
+            return lang
+    return None
 
-    # Languages where keywords are case-insensitive
-    case_insensitive_langs = {"sql", "batch", "powershell"}
 
-    for lang, (start_patterns, _) in LANGUAGE_PATTERNS.items():
-        flags = re.IGNORECASE if lang in case_insensitive_langs else 0
-        for pattern in start_patterns:
-            if re.match(pattern, stripped, flags):
-                return lang
-    return None
+# Generic code continuation patterns (work for most languages)
+_GENERIC_CONTINUATION_RE = re.compile(
+    "|".join([
+        r'^\s+',                        # Indented
+        r'^[{}()\[\]];?\s*$',           # Braces only
+        r'^\w+\s*[=(]',                 # Assignment or call
+        r'^(?://|#|--|/\*|\*)',         # Comments
+        r'^[{};]\s*$',                  # Lone brace/semicolon
+    ])
+)
+
+
+@lru_cache(maxsize=None)
+def _continuation_re_for(language: str) -> re.Pattern[str]:
+    """Combine a language's continuation patterns into one compiled regex."""
+    _, continuation_patterns = LANGUAGE_PATTERNS[language]
+    flags = re.IGNORECASE if language in _CASE_INSENSITIVE_LANGS else 0
+    return re.compile(
+        "|".join(f"(?:{p})" for p in continuation_patterns), flags
+    )
 
 
 def _is_code_continuation(line: str, language: str | None) -> bool:
@@ -445,26 +593,28 @@ def _is_code_continuation(line: str, language: str | None) -> bool:
 
     # Check language-specific continuation patterns
     if language and language in LANGUAGE_PATTERNS:
-        _, continuation_patterns = LANGUAGE_PATTERNS[language]
-        case_insensitive_langs = {"sql", "batch", "powershell"}
-        flags = re.IGNORECASE if language in case_insensitive_langs else 0
-        for pattern in continuation_patterns:
-            if re.match(pattern, stripped, flags):
-                return True
-
-    # Generic code patterns (work for most languages)
-    generic_patterns = [
-        r'^\s+',                        # Indented
-        r'^[{}()\[\]];?\s*$',           # Braces only
-        r'^\w+\s*[=(]',                 # Assignment or call
-        r'^(//|#|--|/\*|\*)',           # Comments
-        r'[{};]\s*$',                   # Ends with brace/semicolon
-    ]
-    for pattern in generic_patterns:
-        if re.match(pattern, stripped):
+        if _continuation_re_for(language).match(stripped):
             return True
 
-    return False
+    return _GENERIC_CONTINUATION_RE.match(stripped) is not None
+
+
+# Patterns that indicate we're leaving code (conversational text),
+# compiled once rather than per extract_code_section call
+_NON_CODE_RE = re.compile(
+    "|".join([
+        r'^what\s+(changed|this|the)',
+        r'^(note|notes|explanation|output|result|example|usage|issue|bug|warning|tip|important):?\s*$',
+        r'^(here|this|the|it|that)\s+(is|are|will|should|would|can|could|may|might)',
+        r'^-\s+[A-Z]',       # Markdown list items starting with capital
+        r'^\d+\.\s+[A-Z]',   # Numbered lists starting with capital
+        r'^(now|next|then|finally|also|and|or|but|however|therefore)\s+',
+        r'^(you|we|i|they|he|she|it)\s+(can|could|should|will|would|may|might|must)',
+        r'^(how|why|what|when|where|which)\s+(it|this|the|to)\s+',
+        r'^(save|copy|run|execute|compile|install|download|open|click)\s+(this|the|it|to)',
+    ]),
+    re.IGNORECASE,
+)
 
 
 def extract_code_section(text: str) -> str | None:
@@ -479,26 +629,20 @@ def extract_code_section(text: str) -> str | None:
     Returns:
         Extracted code section, or None if no code found.
     """
-    lines = text.split('\n')
+    return _extract_inline_code(text.split('\n'))
+
+
+def _extract_inline_code(lines: list[str]) -> str | None:
+    """Run the inline code scanner over a list of lines.
+
+    Shared by extract_code_section (whole response) and
+    extract_code_for_file_fast (non-fenced lines only).
+    """
     code_lines: list[str] = []
     in_code = False
     detected_language: str | None = None
     empty_line_count = 0
 
-    # Patterns that indicate we're leaving code (conversational text)
-    non_code_patterns = [
-        r'^what\s+(changed|this|the)',
-        r'^(note|notes|explanation|output|result|example|usage|issue|bug|warning|tip|important):?\s*$',
-        r'^(here|this|the|it|that)\s+(is|are|will|should|would|can|could|may|might)',
-        r'^-\s+[A-Z]',       # Markdown list items starting with capital
-        r'^\d+\.\s+[A-Z]',   # Numbered lists starting with capital
-        r'^(now|next|then|finally|also|and|or|but|however|therefore)\s+',
-        r'^(you|we|i|they|he|she|it)\s+(can|could|should|will|would|may|might|must)',
-        r'^(how|why|what|when|where|which)\s+(it|this|the|to)\s+',
-        r'^(save|copy|run|execute|compile|install|download|open|click)\s+(this|the|it|to)',
-    ]
-    non_code_regex = re.compile('|'.join(non_code_patterns), re.IGNORECASE)
-
     for line in lines:
         stripped = line.strip()
 
@@ -512,7 +656,7 @@ def extract_code_section(text: str) -> str | None:
             continue
 
         # In code block - check for end markers
-        if non_code_regex.match(stripped) and empty_line_count > 0:
+        if _NON_CODE_RE.match(stripped) and empty_line_count > 0:
             # Hit non-code explanatory text after blank line
             break
 
@@ -564,57 +708,215 @@ def extract_code_section(text: str) -> str | None:
     return None
 
 
-def extract_json(text: str) -> dict | list | None:
+def _scan_response(
+    text: str,
+    target_language: str | None,
+) -> tuple[str | None, str | None, list[str]]:
+    """Single pass over a response separating fenced code from prose.
+
+    Uses the same fence grammar as _scan_code_blocks (``` or ~~~ fences
+    of any length >= 3, indentation allowed) so the fast path never
+    disagrees with extract_code_for_file on which blocks exist.
+
+    Returns:
+        Tuple of (code for the target language, first fenced code,
+        non-fenced lines for the inline fallback).
+    """
+    target_code: str | None = None
+    first_code: str | None = None
+    prose_lines: list[str] = []
+
+    in_fence = False
+    fence_char = "`"
+    fence_len = 3
+    fence_language = ""
+    fence_buffer: list[str] = []
+
+    for line in text.split('\n'):
+        stripped = line.lstrip(" ")
+
+        if in_fence:
+            closing = stripped.rstrip()
+            if (
+                closing.startswith(fence_char * fence_len)
+                and not closing.strip(fence_char)
+            ):
+                code = '\n'.join(fence_buffer).strip()
+                if first_code is None:
+                    first_code = code
+                if fence_language == target_language and target_code is None:
+                    target_code = code
+                in_fence = False
+            else:
+                fence_buffer.append(line)
+            continue
+
+        if stripped[:1] in _FENCE_CHARS:
+            fence_char = stripped[0]
+            run = len(stripped) - len(stripped.lstrip(fence_char))
+            if run >= 3:
+                in_fence = True
+                fence_len = run
+                fence_language = stripped[run:].strip().lower()
+                fence_buffer = []
+                continue
+        prose_lines.append(line)
+
+    return target_code, first_code, prose_lines
+
+
+def extract_code_for_file_fast(
+    text: str,
+    language: str | None = None
+) -> str | None:
+    """Single-pass variant of extract_code_for_file.
+
+    Fuses the fence scan, language filter, and inline-code fallback into
+    one walk over the response instead of re-scanning it per stage.
+    Used on the CLI --output path where responses can be large.
+
+    Args:
+        text: The response text.
+        language: Optional language to prefer (e.g., "python", "bash").
+
+    Returns:
+        Clean code string, or None if no code found.
+    """
+    target = language.lower() if language else None
+    target_code, first_code, prose_lines = _scan_response(text, target)
+
+    if target_code is not None:
+        return target_code
+    if first_code is not None:
+        return first_code
+
+    # No fences at all - the prose lines are the whole response
+    inline = _extract_inline_code(prose_lines)
+    if inline:
+        return inline
+
+    stripped = strip_conversational_text(text)
+    if stripped and _looks_like_code(stripped):
+        return stripped
+
+    return None
+
+
+def extract_json(text: str | bytes) -> dict | list | None:
     """Extract JSON data from a response.
 
     Looks for JSON in code fences first, then tries to find
     inline JSON objects or arrays.
 
     Args:
-        text: The response text.
+        text: The response text. Raw UTF-8 bytes are accepted and fed
+            to the parser directly, avoiding a full decode when the
+            payload is pure JSON.
 
     Returns:
         Parsed JSON data, or None if no valid JSON found.
     """
+    if isinstance(text, bytes):
+        # json.loads parses UTF-8 bytes natively, so a payload that is
+        # pure JSON never needs decoding. Only fall back to a single
+        # decode when there is surrounding prose to scan through.
+        try:
+            return json.loads(text)
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            pass
+        try:
+            text = text.decode("utf-8")
+        except UnicodeDecodeError:
+            return None
+
     # Try code blocks first
     blocks = extract_code_blocks(text)
     for block in blocks:
-        if block["language"] in ("json", ""):
+        if block.language in ("json", ""):
             try:
-                return json.loads(block["code"])
+                return json.loads(block.code)
             except json.JSONDecodeError:
                 continue
 
-    # Try to find inline JSON object
-    obj_match = re.search(r"\{[^{}]*(?:\{[^{}]*\}[^{}]*)*\}", text)
-    if obj_match:
-        try:
-            return json.loads(obj_match.group())
-        except json.JSONDecodeError:
-            pass
-
-    # Try to find inline JSON array
-    arr_match = re.search(r"\[[^\[\]]*(?:\[[^\[\]]*\][^\[\]]*)*\]", text)
-    if arr_match:
-        try:
-            return json.loads(arr_match.group())
-        except json.JSONDecodeError:
-            pass
+    # Try to find inline JSON - object first, then array, matching the
+    # old regex probing order
+    for open_char in ("{", "["):
+        for candidate in _balanced_json_slices(text, open_char):
+            try:
+                return json.loads(candidate)
+            except json.JSONDecodeError:
+                continue
 
     return None
 
 
+def _balanced_json_slices(text: str, open_char: str):
+    """Yield bracket-balanced candidate slices starting at open_char.
+
+    A linear walk counting bracket depth while respecting JSON string
+    state, so only minimal candidate spans are handed to the parser -
+    no regex and no whole-document parse attempts. A stray unbalanced
+    open_char in prose (or a balanced span that turns out not to be
+    JSON) just moves the scan to the next occurrence, matching the old
+    regex's first-balanced-span-anywhere behavior.
+    """
+    close_char = "}" if open_char == "{" else "]"
+    start = text.find(open_char)
+
+    while start >= 0:
+        depth = 0
+        in_string = False
+        escaped = False
+
+        for i in range(start, len(text)):
+            char = text[i]
+            if in_string:
+                if escaped:
+                    escaped = False
+                elif char == "\\":
+                    escaped = True
+                elif char == '"':
+                    in_string = False
+            elif char == '"':
+                in_string = True
+            elif char == open_char:
+                depth += 1
+            elif char == close_char:
+                depth -= 1
+                if depth == 0:
+                    yield text[start:i + 1]
+                    break
+
+        start = text.find(open_char, start + 1)
+
+
+@lru_cache(maxsize=512)
 def is_valid_python(code: str) -> bool:
     """Check if code is syntactically valid Python.
 
+    Results are memoized per code string - live sessions re-check
+    identical snippets (retries, streamed-then-final responses), so
+    avoid passing huge one-off strings that would churn the cache.
+
     Args:
         code: Python code string.
 
     Returns:
         True if the code parses without syntax errors.
     """
+    # Constant-time reject: no Python statement can begin with a closing
+    # bracket, a comparison operator, or a backtick. Streamed partial
+    # responses hit this constantly, and a couple of comparisons beat
+    # invoking the compiler. Empty input falls through to compile(),
+    # which accepts it (an empty module), as it always has.
+    stripped = code.lstrip()
+    if stripped and stripped[0] in ")]}>`<":
+        return False
+
     try:
-        ast.parse(code)
+        # compile() without an AST flag skips materializing the tree we
+        # would only throw away
+        compile(code, "<lumo>", "exec", dont_inherit=True)
         return True
     except SyntaxError:
         return False
@@ -632,11 +934,61 @@ def is_valid_bash(code: str) -> bool:
     Returns:
         True if the code looks like valid bash.
     """
-    # Check for balanced quotes (simple check)
-    single_quotes = code.count("'") - code.count("\\'")
-    double_quotes = code.count('"') - code.count('\\"')
+    # Single pass over the code tracking quote/escape state and bracket
+    # depth, instead of the old raw quote counting that miscounted
+    # quotes nested inside the other quote style
+    in_single = False
+    in_double = False
+    in_backtick = False
+    escaped = False
+    paren_depth = 0
+    brace_depth = 0
+
+    for char in code:
+        if escaped:
+            escaped = False
+            continue
+        if in_single:
+            # No escapes inside single quotes
+            if char == "'":
+                in_single = False
+            continue
+        if char == "\\":
+            escaped = True
+        elif char == '"':
+            in_double = not in_double
+        elif in_double:
+            continue
+        elif char == "'":
+            in_single = True
+        elif char == "`":
+            in_backtick = not in_backtick
+        elif char == "(":
+            paren_depth += 1
+        elif char == ")":
+            paren_depth -= 1
+        elif char == "{":
+            brace_depth += 1
+        elif char == "}":
+            brace_depth -= 1
+
+    # Unclosed quotes are always invalid
+    if in_single or in_double or in_backtick:
+        return False
+
+    # More closers than openers is invalid; bare ')' is fine inside a
+    # case statement's pattern arms
+    if brace_depth < 0:
+        return False
+    if paren_depth < 0 and not re.search(r"\bcase\b", code):
+        return False
 
-    if single_quotes % 2 != 0 or double_quotes % 2 != 0:
+    # Block keywords: more closers than openers can never be valid.
+    # Closers only count at the start of a line so words like
+    # 'echo done' don't trip the check.
+    openers = len(re.findall(r"\b(?:if|do|case)\b", code))
+    closers = len(re.findall(r"^\s*(?:fi|done|esac)\b", code, re.MULTILINE))
+    if closers > openers:
         return False
 
     # Check for common bash patterns
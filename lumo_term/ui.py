@@ -8,6 +8,7 @@ from rich.markdown import Markdown
 from rich.text import Text
 from textual import on, work
 from textual.app import App, ComposeResult
+from textual.cache import LRUCache
 from textual.binding import Binding
 from textual.containers import Container, Vertical, VerticalScroll
 from textual.widgets import Footer, Header, Input, Static, LoadingIndicator
@@ -174,6 +175,11 @@ class LumoApp(App):
         Binding("ctrl+c", "cancel", "Cancel"),
     ]
 
+    # Textual parses CSS per Stylesheet instance, and every app gets its
+    # own. All LumoApp instances share this rule cache (keyed on the CSS
+    # text itself) so the string above is tokenized once per process.
+    _shared_css_cache: LRUCache = LRUCache(64)
+
     def __init__(
         self,
         firefox_profile: Optional[Path] = None,
@@ -185,6 +191,7 @@ class LumoApp(App):
         self.headless = headless
         self._client: Optional[LumoBrowser] = None
         self._is_generating = False
+        self.stylesheet._parse_cache = self._shared_css_cache
 
     def compose(self) -> ComposeResult:
         yield Header(show_clock=True)
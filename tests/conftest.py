@@ -1,11 +1,17 @@
 """Pytest fixtures for LUMO-Term tests."""
 
 import asyncio
+import io
 import pytest
+import pytest_asyncio
 import time
 from pathlib import Path
 from typing import AsyncGenerator
+from unittest.mock import AsyncMock
 
+from rich.console import Console
+
+from lumo_term import cli
 from lumo_term.browser import LumoBrowser
 from lumo_term.config import load_config
 
@@ -50,12 +56,18 @@ def firefox_profile() -> Path | None:
     return None
 
 
-@pytest.fixture
-async def browser(firefox_profile: Path | None) -> AsyncGenerator[LumoBrowser, None]:
-    """Create a fresh browser instance for each test.
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def session_browser(firefox_profile: Path | None) -> AsyncGenerator[LumoBrowser, None]:
+    """Share one started browser across the whole test session.
+
+    A Firefox launch costs tens of seconds, and most tests only need an
+    already-started client to send messages through. Tests that must
+    observe startup or teardown itself (startup benchmarks, profile
+    cleanup) construct their own LumoBrowser instead of using this.
 
-    This fixture creates a new browser session, yields it for testing,
-    and ensures cleanup after the test completes.
+    The shared instance carries conversation state between consumers;
+    use the per-test `browser` wrapper below unless the test manages
+    conversations itself.
     """
     client = LumoBrowser(firefox_profile=firefox_profile, headless=True)
 
@@ -75,6 +87,19 @@ async def browser(firefox_profile: Path | None) -> AsyncGenerator[LumoBrowser, N
         await client.stop()
 
 
+@pytest.fixture
+async def browser(session_browser: LumoBrowser) -> LumoBrowser:
+    """Hand out the shared browser with a fresh conversation.
+
+    Reuses the session's started Firefox (the expensive part) but opens
+    a new conversation first, so tests that assert on context - the
+    conversation suite especially - never see messages left behind by
+    earlier tests.
+    """
+    await session_browser.new_conversation()
+    return session_browser
+
+
 @pytest.fixture
 async def persistent_browser(firefox_profile: Path | None) -> AsyncGenerator[LumoBrowser, None]:
     """Create a browser instance that persists across multiple tests in a class.
@@ -100,6 +125,52 @@ def test_messages() -> dict:
     return TEST_MESSAGES.copy()
 
 
+# One throwaway console for the whole session; the fixture only swaps
+# the module attribute per test instead of building a Console each time
+_SILENT_CONSOLE = Console(file=io.StringIO(), force_terminal=False)
+
+
+@pytest.fixture(autouse=True)
+def silent_console():
+    """Route CLI output into a discarded buffer for every test.
+
+    Swapping the attribute directly is cheaper than the
+    patch("lumo_term.cli.console") context manager tests used to enter
+    individually. Tests that assert on console output still install
+    their own mock over this.
+    """
+    orig = cli.console
+    cli.console = _SILENT_CONSOLE
+    yield
+    cli.console = orig
+    buffer = _SILENT_CONSOLE.file
+    buffer.seek(0)
+    buffer.truncate(0)
+
+
+@pytest.fixture(scope="module")
+def mock_client_factory():
+    """Hand out one reusable mocked browser client per module.
+
+    AsyncMock construction walks the spec and wraps coroutines, which
+    adds up when every async test builds its own client. The factory
+    resets the shared mock and reassigns send_message, so tests still
+    get clean call records. Speccing against LumoBrowser skips mock
+    attribute auto-creation and rejects calls to nonexistent methods.
+    """
+    client = AsyncMock(spec=LumoBrowser)
+
+    def make(return_value="OK", side_effect=None):
+        client.reset_mock()
+        client.send_message = AsyncMock(
+            return_value=return_value, side_effect=side_effect
+        )
+        client.new_conversation = AsyncMock()
+        return client
+
+    return make
+
+
 # ============================================================================
 # Markers
 # ============================================================================
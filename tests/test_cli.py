@@ -9,25 +9,27 @@ from argparse import Namespace
 from lumo_term.cli import parse_args, run_repl, run_single_message
 
 
+# Built once so make_mock_args doesn't rebuild the defaults dict per test.
+_DEFAULT_ARGS_TEMPLATE = {
+    "no_headless": False,
+    "profile": None,
+    "new": False,
+    "message": None,
+    "files": None,
+    "output": None,
+    "append": False,
+    "copy": False,
+    "tui": False,
+    "plain": False,
+    "prompt": None,
+    "code_only": False,
+    "language": None,
+}
+
+
 def make_mock_args(**kwargs):
     """Create mock args with defaults."""
-    defaults = {
-        "no_headless": False,
-        "profile": None,
-        "new": False,
-        "message": None,
-        "files": None,
-        "output": None,
-        "append": False,
-        "copy": False,
-        "tui": False,
-        "plain": False,
-        "prompt": None,
-        "code_only": False,
-        "language": None,
-    }
-    defaults.update(kwargs)
-    return Namespace(**defaults)
+    return Namespace(**{**_DEFAULT_ARGS_TEMPLATE, **kwargs})
 
 
 # ============================================================================
